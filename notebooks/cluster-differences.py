@@ -19,41 +19,31 @@
 
 # %%
 
-import json
+import errno
 import os
 import os.path
+import re
 import shutil
 import warnings
-from collections import Counter, defaultdict
-from dataclasses import dataclass
+from collections import defaultdict
+from collections.abc import Hashable
+from concurrent.futures import ThreadPoolExecutor
 from glob import glob
-from typing import Any, Generic, TypeVar
+from typing import Any
 
 # import mplcursors
 import matplotlib.pyplot as plt
 import numpy as np
+import orjson
+import scipy.sparse
 import seaborn as sns
 from common_functions import open_file
 from IPython.display import Markdown, display
+from joblib import Parallel, delayed
 from matplotlib.gridspec import GridSpec
-from serde.json import from_json
 from sklearn.cluster import SpectralBiclustering
 from sklearn.exceptions import ConvergenceWarning
 
-T = TypeVar("T")
-
-
-@dataclass(order=True)
-class SortableTuple(Generic[T]):
-    """
-    Prevent that `np.argsort` is looking into a tuple and treating it as another dimension.
-    This is achieved by simply wrapping the tuple, thus inheriting its sorting order.
-    Since it no longer is a plain tuple numpy will not further expand it.
-    """
-
-    first: Any
-
-
 plt.rcParams["savefig.bbox"] = "tight"
 plt.rcParams["figure.autolayout"] = True
 
@@ -67,60 +57,123 @@ plt.rcParams["figure.autolayout"] = True
 # basepath, resolver_configurations
 
 # %% [raw]
-# for resolver_configuration in resolver_configurations:
+# def hardlink_tree(src: str, dst: str) -> None:
+#     """
+#     Recreate the directory tree `src` in `dst` using hardlinks for all files.
+#
+#     Files are copied instead if `dst` is on a different filesystem.
+#     """
+#     for root, _dirs, files in os.walk(src):
+#         dst_root = os.path.join(dst, os.path.relpath(root, src))
+#         os.makedirs(dst_root, exist_ok=True)
+#         for file in files:
+#             try:
+#                 os.link(os.path.join(root, file), os.path.join(dst_root, file))
+#             except FileExistsError:
+#                 pass
+#             except OSError as err:
+#                 if err.errno != errno.EXDEV:
+#                     raise
+#                 shutil.copy2(os.path.join(root, file), os.path.join(dst_root, file))
+#
+#
+# def process_config(
+#     resolver_configuration: str, basepath: str
+# ) -> tuple[
+#     list[set[str]], list[str], list[str], scipy.sparse.csr_matrix, SpectralBiclustering
+# ]:
+#     """
+#     Load the key differences of a resolver configuration and find the largest converging biclustering.
+#
+#     Runs in a joblib worker, so it must not plot or display anything.
+#     """
 #     y_labels = []
 #     raw_data = []
 #     for file in glob(
 #         os.path.join(basepath, "*", resolver_configuration, "key-differences.json")
 #     ):
-#         keys = from_json(set, open_file(file, "rt").read())
+#         with open_file(file, "rb") as f:
+#             keys = set(orjson.loads(f.read()))
 #         raw_data.append(keys)
 #         y_labels.append(os.path.basename(os.path.dirname(os.path.dirname(file))))
 #     all_keys = list({key for keyset in raw_data for key in keyset})
+#     key_to_col = {key: idx for idx, key in enumerate(all_keys)}
 #
-#     data = np.array(
-#         [[(1 if key in keyset else 0) for key in all_keys] for keyset in raw_data]
+#     # Build the presence matrix sparse, since each instance only differs in few keys
+#     rows: list[int] = []
+#     cols: list[int] = []
+#     for row, keyset in enumerate(raw_data):
+#         rows.extend([row] * len(keyset))
+#         cols.extend(key_to_col[key] for key in keyset)
+#     data = scipy.sparse.csr_matrix(
+#         (np.ones(len(rows), dtype=np.uint8), (rows, cols)),
+#         shape=(len(raw_data), len(all_keys)),
 #     )
+#     # SpectralBiclustering with `method="log"` needs a dense input
+#     # Densify once as float64, which scikit-learn would otherwise convert to on every fit
+#     fit_input = data.astype(np.float64).toarray()
+#
+#     # Cache of all fits, `None` marks cluster sizes which do not converge
+#     fits: dict[tuple[int, int], SpectralBiclustering | None] = {}
+#
+#     def try_fit(n_clusters: tuple[int, int]) -> SpectralBiclustering | None:
+#         if n_clusters not in fits:
+#             print(f"Try converging of {n_clusters}")
+#             model = SpectralBiclustering(
+#                 n_clusters=n_clusters, method="log", random_state=0
+#             )
+#             try:
+#                 with warnings.catch_warnings():
+#                     warnings.filterwarnings("error")
+#                     model.fit(fit_input)
+#                 fits[n_clusters] = model
+#             except ConvergenceWarning as converge:
+#                 fits[n_clusters] = None
+#         return fits[n_clusters]
+#
+#     def grow(converges, start: int, limit: int = 30) -> int:
+#         """
+#         Find the largest cluster size up to `limit` which still converges.
+#
+#         Double the size until it no longer converges, then bisect between the last success and the first failure.
+#         """
+#         good, bad = start, start + 1
+#         while bad <= limit and converges(bad):
+#             good, bad = bad, min(bad * 2, limit + 1)
+#         while bad - good > 1:
+#             mid = (good + bad) // 2
+#             if converges(mid):
+#                 good = mid
+#             else:
+#                 bad = mid
+#         return good
 #
 #     # Expand the cluster sizes until it no longer converges
 #     x_cluster, y_cluster = 4, 4
-#     # x_cluster_prev, y_cluster_prev
-#     grow_x = True
-#     grow_y = True
-#     with warnings.catch_warnings():
-#         warnings.filterwarnings("error")
-#         while grow_x or grow_y:
-#             if grow_x:
-#                 try:
-#                     n_clusters = (x_cluster + 1, y_cluster)
-#                     print(f"Try converging of {n_clusters}")
-#                     model = SpectralBiclustering(
-#                         n_clusters=n_clusters, method="log", random_state=0
-#                     )
-#                     model.fit(data)
-#                     x_cluster += 1
-#                 except ConvergenceWarning as converge:
-#                     grow_x = False
-#
-#             if grow_y:
-#                 try:
-#                     n_clusters = (x_cluster, y_cluster + 1)
-#                     print(f"Try converging of {n_clusters}")
-#                     model = SpectralBiclustering(
-#                         n_clusters=n_clusters, method="log", random_state=0
-#                     )
-#                     model.fit(data)
-#                     y_cluster += 1
-#                 except ConvergenceWarning as converge:
-#                     grow_y = False
-#             if x_cluster == 30:
-#                 grow_x = False
-#             if y_cluster == 30:
-#                 grow_y = False
+#     x_cluster = grow(lambda x: try_fit((x, y_cluster)) is not None, x_cluster)
+#     y_cluster = grow(lambda y: try_fit((x_cluster, y)) is not None, y_cluster)
 #
 #     n_clusters = (x_cluster, y_cluster)
-#     model = SpectralBiclustering(n_clusters=n_clusters, method="log", random_state=0)
-#     model.fit(data)
+#     model = try_fit(n_clusters)
+#     if model is None:
+#         model = SpectralBiclustering(
+#             n_clusters=n_clusters, method="log", random_state=0
+#         )
+#         model.fit(fit_input)
+#
+#     return raw_data, y_labels, all_keys, data, model
+#
+#
+# # Fitting is independent per resolver configuration, plotting happens afterwards in the notebook process
+# fitted = Parallel(n_jobs=-1, backend="loky")(
+#     delayed(process_config)(resolver_configuration, basepath)
+#     for resolver_configuration in resolver_configurations
+# )
+# mdout = []
+# for resolver_configuration, (raw_data, y_labels, all_keys, data, model) in zip(
+#     resolver_configurations, fitted
+# ):
+#     n_clusters = model.n_clusters
 #
 #     plt.close()
 #     plt.rcParams["figure.figsize"] = (20, 15)
@@ -129,16 +182,13 @@ plt.rcParams["figure.autolayout"] = True
 #     plt.rcParams["figure.constrained_layout.use"] = True
 #
 #     # Sort keys first on cluster and second lexicographical within
-#     column_sort_idxs = np.argsort(
-#         [SortableTuple((col, key)) for col, key in zip(model.column_labels_, all_keys)]
-#     )
-#     row_sort_idxs = np.argsort(
-#         [SortableTuple((row, label)) for row, label in zip(model.row_labels_, y_labels)]
-#     )
+#     # `np.lexsort` sorts by the last key first
+#     column_sort_idxs = np.lexsort((np.array(all_keys), model.column_labels_))
+#     row_sort_idxs = np.lexsort((np.array(y_labels), model.row_labels_))
 #
 #     # Plot the re-arranged data
-#     fit_data = data[row_sort_idxs]
-#     fit_data = fit_data[:, column_sort_idxs]
+#     # Reorder while sparse and only densify the final image
+#     fit_data = data[row_sort_idxs][:, column_sort_idxs].toarray()
 #     # plt.gca().matshow(fit_data, cmap=plt.cm.Blues, aspect="auto")
 #
 #     # Calculate a unique color per xy cluster
@@ -148,20 +198,19 @@ plt.rcParams["figure.autolayout"] = True
 #         (np.sort(model.column_labels_) % 2) * 2,
 #     )
 #
-#     fdc2color = {
-#         0: (255, 0, 0),
-#         1: (0, 255, 255),
-#         2: (0, 0, 255),
-#         3: (255, 255, 0),
-#     }
-#     img = []
-#     for fd_row, fdc_row in zip(fit_data, fit_data_color):
-#         row = []
-#         for fd, fdc in zip(fd_row, fdc_row):
-#             r, g, b = fdc2color[fdc]
-#             pixel = (r, g, b, fd * 240 + 15)
-#             row.append(pixel)
-#         img.append(row)
+#     # Index of the color is the value in `fit_data_color`
+#     palette = np.array(
+#         [
+#             (255, 0, 0),
+#             (0, 255, 255),
+#             (0, 0, 255),
+#             (255, 255, 0),
+#         ],
+#         dtype=np.uint8,
+#     )
+#     img = np.empty(fit_data.shape + (4,), dtype=np.uint8)
+#     img[..., :3] = palette[fit_data_color]
+#     img[..., 3] = fit_data * 240 + 15
 #     plt.gca().matshow(img, aspect="auto")
 #
 #     # # Place a grey shade over the image to symbolize the distinct regions
@@ -181,36 +230,35 @@ plt.rcParams["figure.autolayout"] = True
 #     keys_reordered = [all_keys[idx] for idx in column_sort_idxs]
 #
 #     # Print first entity per row-cluster
+#     # The row labels are sorted, so each cluster starts at the first occurrence of its id
 #     print()
-#     clustersizes: Counter[int] = Counter(model.row_labels_)
-#     last_row_cluster_id = None
-#     for row_cluster_id, label, raw_data in zip(
-#         sorted(model.row_labels_), y_labels_reordered, raw_data_reordered
-#     ):
-#         if row_cluster_id != last_row_cluster_id:
-#             # Copy instances for each cluster into a separate folder
-#             outdir = ""
-#             if clusteroutput is not None:
-#                 sourcedir = os.path.join(basepath, label, resolver_configuration)
-#                 outdir = os.path.join(
-#                     clusteroutput,
-#                     resolver_configuration,
-#                     f"{label}-clustersize-{clustersizes[row_cluster_id]}",
-#                 )
-#                 os.makedirs(outdir, exist_ok=True)
-#                 shutil.copytree(sourcedir, outdir, dirs_exist_ok=True)
+#     _cluster_ids, first_idxs, clustersizes = np.unique(
+#         model.row_labels_[row_sort_idxs], return_index=True, return_counts=True
+#     )
+#     for first_idx, clustersize in zip(first_idxs, clustersizes):
+#         label = y_labels_reordered[first_idx]
+#         keyset = raw_data_reordered[first_idx]
 #
-#             mdout = [
-#                 f"* [`{label}`](./{outdir.replace('/mnt/data/Downloads/', './')}/fulldiff.txt) (Size: {clustersizes[row_cluster_id]})"
-#             ]
-#             for key in sorted(raw_data):
-#                 mdout.append(f"    * `{key}`")
-#             mdout.append(
-#                 f"\n`cargo run --release --bin fuzzer  -- single {outdir}/fuzz-suite.json {resolver_configuration.replace('-', ' ')}`"
+#         # Copy instances for each cluster into a separate folder
+#         outdir = ""
+#         if clusteroutput is not None:
+#             sourcedir = os.path.join(basepath, label, resolver_configuration)
+#             outdir = os.path.join(
+#                 clusteroutput,
+#                 resolver_configuration,
+#                 f"{label}-clustersize-{clustersize}",
 #             )
+#             os.makedirs(outdir, exist_ok=True)
+#             hardlink_tree(sourcedir, outdir)
 #
-#             display(Markdown("\n".join(mdout)))
-#             last_row_cluster_id = row_cluster_id
+#         mdout.append(
+#             f"* [`{label}`](./{outdir.replace('/mnt/data/Downloads/', './')}/fulldiff.txt) (Size: {clustersize})"
+#         )
+#         for key in sorted(keyset):
+#             mdout.append(f"    * `{key}`")
+#         mdout.append(
+#             f"\n`cargo run --release --bin fuzzer  -- single {outdir}/fuzz-suite.json {resolver_configuration.replace('-', ' ')}`"
+#         )
 #
 #     # Add labels for the features
 #     _locs, new_labels = plt.xticks(
@@ -236,6 +284,8 @@ plt.rcParams["figure.autolayout"] = True
 #     plt.title(f"{resolver_configuration} {n_clusters}")
 #     plt.savefig(f"{resolver_configuration}-{n_clusters[0]}-{n_clusters[1]}.svg")
 #     plt.show()
+#
+# display(Markdown("\n".join(mdout)))
 
 
 # %%
@@ -269,6 +319,19 @@ special_fields_keys = [
     "Truncated (TC)",
 ]
 keep_hyphen = ["pdns-recursor", "knot-resolver", "trust-dns"]
+# Matches either a resolver name containing a `-` or the `-` separating the resolvers
+resolver_separator = re.compile(
+    "(" + "|".join(re.escape(rname) for rname in keep_hyphen) + ")|-"
+)
+
+
+def unhyphenate_resolvers(resolver_configuration: str) -> str:
+    """
+    Replace the `-` between the resolvers with a space, but preserve the `-` in the resolver names.
+    """
+    return resolver_separator.sub(
+        lambda match: match.group(1) or " ", resolver_configuration
+    )
 
 
 def display_field(value: str | bool | int | None) -> str:
@@ -286,79 +349,133 @@ def display_field(value: str | bool | int | None) -> str:
             return ""
 
 
+def read_file(path: str) -> bytes:
+    with open_file(path, "rb") as f:
+        return f.read()
+
+
+def freeze(value: Any) -> Hashable:
+    """
+    Convert parsed JSON into a hashable value, such that equal JSON documents compare equal.
+    """
+    match value:
+        case list():
+            return tuple(freeze(x) for x in value)
+        case dict():
+            return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+        case _:
+            return value
+
+
+def symmetric_matrix(matrix: dict[str, dict[str, int]]) -> tuple[list[str], np.ndarray]:
+    """
+    Convert the per resolver pair values into a dense matrix.
+
+    Only one direction of each resolver pair is stored, so missing entries are filled from the mirrored pair.
+    """
+    resolv = sorted(matrix.keys())
+    resolv_idx = {r: idx for idx, r in enumerate(resolv)}
+    dense = np.zeros((len(resolv), len(resolv)))
+    for rleft, row in matrix.items():
+        for rright, value in row.items():
+            if rright in resolv_idx:
+                dense[resolv_idx[rleft], resolv_idx[rright]] = value
+    return resolv, np.where(dense != 0, dense, dense.T)
+
+
 cluster_count_matrix: dict[str, dict[str, int]] = {}
 cluster_sizes_matrix: dict[str, dict[str, int]] = {}
 mdout = []
 
-# Print the top largest clusters including information how they differ, steps to reproduce etc.
-for resolver_configuration in resolver_configurations:
-    fingerprint_clusters = defaultdict(list)
-    for file in glob(
-        os.path.join(basepath, "*", resolver_configuration, "fingerprint.json")
-    ):
-        with open_file(file, "rt") as f:
-            fingerprint = f.read()
-        fuzzid = os.path.basename(os.path.dirname(os.path.dirname(file)))
-        fingerprint_clusters[fingerprint].append(fuzzid)
-
-    clusters = sorted(
-        [(len(ids), fp, ids) for fp, ids in fingerprint_clusters.items()], reverse=True
-    )
-
-    # Preserve the `-` in the resolver name
-    resolvers = resolver_configuration
-    for ridx, rname in enumerate(keep_hyphen):
-        resolvers = resolvers.replace(rname, f"TMP{ridx}DNS")
-    resolvers = resolvers.replace("-", " ")
-    for ridx, rname in enumerate(keep_hyphen):
-        resolvers = resolvers.replace(f"TMP{ridx}DNS", rname)
-
-    resolver_left, resolver_right = resolvers.split(" ")
-    # Save the number of clusters and the size of each cluster per pair
-    cluster_count_matrix.setdefault(resolver_left, {})[resolver_right] = len(clusters)
-    cluster_sizes_matrix.setdefault(resolver_left, {})[resolver_right] = clusters[0][0]
-
-    mdout.append(f"# {resolver_configuration} (Clusters: {len(clusters)})")
-    for count, fp, ids in clusters[:4]:
-        ids.sort()
-        clusterpath = f"{basepath}/{ids[0]}/{resolver_configuration}"
-        mdout.append(
-            f"""* Cluster of size {count}: [`{ids[0]}`]({clusterpath.replace('/mnt/data/Downloads/', './').replace(" ", "%20")}/fulldiff.txt)  """
+# Scan the fuzzing run once and group the fingerprint files per resolver configuration
+fingerprint_files: dict[str, list[tuple[str, str]]] = defaultdict(list)
+with os.scandir(basepath) as fuzz_entries:
+    for fuzz_entry in fuzz_entries:
+        if not fuzz_entry.is_dir():
+            continue
+        with os.scandir(fuzz_entry.path) as config_entries:
+            for config_entry in config_entries:
+                file = os.path.join(config_entry.path, "fingerprint.json")
+                if config_entry.is_dir() and os.path.exists(file):
+                    fingerprint_files[config_entry.name].append((fuzz_entry.name, file))
+# The directory listing order depends on the filesystem
+for files in fingerprint_files.values():
+    files.sort()
+
+# The files are small, so overlap the reads to hide the per-file latency
+# One pool is shared by all resolver configurations
+with ThreadPoolExecutor(max_workers=32) as file_reader:
+    # Print the top largest clusters including information how they differ, steps to reproduce etc.
+    for resolver_configuration in resolver_configurations:
+        # Cluster on the parsed fingerprint and keep the first fingerprint per cluster
+        fingerprint_clusters: dict[Hashable, list[str]] = defaultdict(list)
+        exemplars: dict[Hashable, Any] = {}
+        files = fingerprint_files[resolver_configuration]
+        contents = list(file_reader.map(read_file, (file for _fuzzid, file in files)))
+        for (fuzzid, _file), content in zip(files, contents):
+            fingerprint = orjson.loads(content)
+            fp = freeze(fingerprint)
+            exemplars.setdefault(fp, fingerprint)
+            fingerprint_clusters[fp].append(fuzzid)
+
+        # The frozen fingerprints mix types like `None` and `str`, so they cannot be part of the sort key
+        # Break ties by the smallest fuzzid, such that the order does not depend on the directory listing
+        clusters = sorted(
+            [(len(ids), fp, sorted(ids)) for fp, ids in fingerprint_clusters.items()],
+            key=lambda cluster: (-cluster[0], cluster[2][0]),
         )
 
-        mdout.append(
-            f"""    `cargo run --release --bin fuzzer  -- single "{clusterpath}/fuzz-suite.postcard" {resolvers}`"""
-        )
+        resolvers = unhyphenate_resolvers(resolver_configuration)
 
-        fingerprint = json.loads(fp)
-        mdout.append(f"""    |     | {" | ".join(special_fields_keys)} |""")
-        mdout.append(
-            f"""    | :-- | {" | ".join("--:" for _ in special_fields_keys)} |"""
-        )
-        mdout.append(
-            f"""    | L   | {" | ".join(display_field(x) for x in fingerprint['special_fields'][0])} |"""
-        )
-        mdout.append(
-            f"""    | R   | {" | ".join(display_field(x) for x in fingerprint['special_fields'][1])} |"""
+        resolver_left, resolver_right = resolvers.split(" ")
+        # Save the number of clusters and the size of each cluster per pair
+        cluster_count_matrix.setdefault(resolver_left, {})[resolver_right] = len(
+            clusters
         )
+        cluster_sizes_matrix.setdefault(resolver_left, {})[resolver_right] = clusters[
+            0
+        ][0]
+
+        mdout.append(f"# {resolver_configuration} (Clusters: {len(clusters)})")
+        for count, fp, ids in clusters[:4]:
+            clusterpath = f"{basepath}/{ids[0]}/{resolver_configuration}"
+            mdout.append(
+                f"""* Cluster of size {count}: [`{ids[0]}`]({clusterpath.replace('/mnt/data/Downloads/', './').replace(" ", "%20")}/fulldiff.txt)  """
+            )
 
-        mdout.append("""    """)
-        mdout.append("""    **Key Differences**""")
-        mdout.append("""    ```""")
-        for key_diff in fingerprint["key_diffs"]:
-            mdout.append(f"""    {key_diff}""")
-        mdout.append("""    ```""")
-
-        mdout.append("""    """)
-        mdout.append("""    <details><summary>All</summary>""")
-        mdout.append("""    """)
-        for i in ids:
-            path = f"{basepath}/{i}/{resolver_configuration}".replace(
-                "/mnt/data/Downloads/", "./"
-            ).replace(" ", "%20")
-            mdout.append(f"""    [`{i}`]({path}/fulldiff.txt)""")
-        mdout.append("""    """)
-        mdout.append("""    </details>""")
+            mdout.append(
+                f"""    `cargo run --release --bin fuzzer  -- single "{clusterpath}/fuzz-suite.postcard" {resolvers}`"""
+            )
+
+            fingerprint = exemplars[fp]
+            mdout.append(f"""    |     | {" | ".join(special_fields_keys)} |""")
+            mdout.append(
+                f"""    | :-- | {" | ".join("--:" for _ in special_fields_keys)} |"""
+            )
+            mdout.append(
+                f"""    | L   | {" | ".join(display_field(x) for x in fingerprint['special_fields'][0])} |"""
+            )
+            mdout.append(
+                f"""    | R   | {" | ".join(display_field(x) for x in fingerprint['special_fields'][1])} |"""
+            )
+
+            mdout.append("""    """)
+            mdout.append("""    **Key Differences**""")
+            mdout.append("""    ```""")
+            for key_diff in fingerprint["key_diffs"]:
+                mdout.append(f"""    {key_diff}""")
+            mdout.append("""    ```""")
+
+            mdout.append("""    """)
+            mdout.append("""    <details><summary>All</summary>""")
+            mdout.append("""    """)
+            for i in ids:
+                path = f"{basepath}/{i}/{resolver_configuration}".replace(
+                    "/mnt/data/Downloads/", "./"
+                ).replace(" ", "%20")
+                mdout.append(f"""    [`{i}`]({path}/fulldiff.txt)""")
+            mdout.append("""    """)
+            mdout.append("""    </details>""")
 
 fig = plt.figure(layout="constrained", figsize=(20, 5))
 
@@ -366,17 +483,9 @@ gs = GridSpec(1, 2, figure=fig)
 ax1 = fig.add_subplot(gs[0, 0])
 ax2 = fig.add_subplot(gs[0, 1])
 
-resolv = sorted(cluster_count_matrix.keys())
+resolv, dense_matrix = symmetric_matrix(cluster_count_matrix)
 sns.heatmap(
-    [
-        [
-            cluster_count_matrix[rleft].get(
-                rright, cluster_count_matrix[rright].get(rleft, 0.0)
-            )
-            for rright in resolv
-        ]
-        for rleft in resolv
-    ],
+    dense_matrix,
     vmin=0,
     annot=True,
     fmt=".0f",
@@ -385,17 +494,9 @@ sns.heatmap(
     ax=ax1,
 )
 ax1.set_title("Number of clusters clusters")
-resolv = sorted(cluster_sizes_matrix.keys())
+resolv, dense_matrix = symmetric_matrix(cluster_sizes_matrix)
 sns.heatmap(
-    [
-        [
-            cluster_sizes_matrix[rleft].get(
-                rright, cluster_sizes_matrix[rright].get(rleft, 0.0)
-            )
-            for rright in resolv
-        ]
-        for rleft in resolv
-    ],
+    dense_matrix,
     vmin=0,
     annot=True,
     fmt=".0f",
@@ -21,12 +21,14 @@ import dataclasses
 
 # %%
 import functools
-import json
+import mmap
 import os
 import os.path
+import re
 from collections.abc import Callable
-from glob import glob
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from typing import Any, TypedDict
 
 import common_functions
 import ipywidgets as widgets
@@ -34,36 +36,268 @@ import matplotlib.axes
 
 # import mplcursors
 import matplotlib.pyplot as plt
+import msgspec
+import numpy as np
+import orjson
 from IPython.display import display
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
 from matplotlib.ticker import FuncFormatter, MultipleLocator, PercentFormatter
 
 common_functions.matplotlib_better_lines()
 plt.rcParams["savefig.bbox"] = "tight"
 plt.rcParams["figure.autolayout"] = True
 
-Stats = list[dict[str, Any]]
+
+class StartTime(TypedDict):
+    secs: int
+    nanos: int
+
+
+class CoverageStats(TypedDict):
+    edges: int
+    explored_edges: int
+    progress_fuzz_case_count: int
+
+
+class FuzzingStats(TypedDict):
+    """
+    The parts of the fuzzer statistics which are used for plotting.
+
+    Decoding into this type skips all other fields of the stats files.
+    """
+
+    start_time: StartTime
+    coverage: dict[str, CoverageStats]
+    # Pairs of resolvers with their difference statistics
+    differences: list[tuple[tuple[str, str], dict[str, Any]]]
+
+
+Stats = list[FuzzingStats]
+stats_decoder = msgspec.json.Decoder(FuzzingStats)
+
+
+def sample_timestamps(stats: Stats) -> np.ndarray:
+    """
+    Return the start time of each sample in seconds.
+    """
+    secs = np.fromiter(
+        (stat["start_time"]["secs"] for stat in stats), dtype=np.int64, count=len(stats)
+    )
+    nanos = np.fromiter(
+        (stat["start_time"]["nanos"] for stat in stats),
+        dtype=np.int32,
+        count=len(stats),
+    )
+    # There is no nanosecond option for timedelta
+    return secs.astype(np.float64) + nanos * 1e-9
+
+
+@dataclasses.dataclass
+class RunData:
+    """
+    The stats of a fuzzing run together with the values all plots derive from them.
+    """
+
+    name: str
+    stats: Stats
+    # Resolvers with coverage stats
+    resolvers: list[str]
+    # Resolver pairs with difference stats
+    pairs: list[tuple[str, str]]
+    # Keys of `per_diff_kind` and `per_diff_category` over all resolver pairs
+    diff_kinds: list[str]
+    diff_categories: list[str]
+    # Start time of each sample in seconds
+    timestamps: np.ndarray
+
+    @classmethod
+    def from_stats(cls, name: str, stats: Stats) -> "RunData":
+        # Checking the last timestamp should be enough, since the pairs and keys can only ever increase
+        differences = stats[-1]["differences"]
+        return cls(
+            name=name,
+            stats=stats,
+            resolvers=list(stats[0]["coverage"]),
+            pairs=[(resolvers[0], resolvers[1]) for resolvers, _ in differences],
+            diff_kinds=sorted(
+                {key for _, dstats in differences for key in dstats["per_diff_kind"]}
+            ),
+            # Older stats do not contain the difference categories yet
+            diff_categories=sorted(
+                {
+                    key
+                    for _, dstats in differences
+                    for key in dstats.get("per_diff_category", {})
+                }
+            ),
+            timestamps=sample_timestamps(stats),
+        )
+
 
 # %%
 callbacks: list[Any] = []
-latest_stats: tuple[str, Stats] | None = None
+latest_stats: RunData | None = None
+
+
+def load_stats_file(path: str) -> FuzzingStats:
+    with open(path, "rb") as f:
+        return stats_decoder.decode(f.read())
+
+
+# Fuzzing runs are stored in folders named after their start time, e.g., `2023-04-18 23:53`
+fuzzing_run_name = re.compile(r"20\d\d-\d\d-\d\d ")
+
+
+def list_fuzzing_runs(basepath: str = "/mnt/data/Downloads/dnsdiff") -> list[str]:
+    with os.scandir(basepath) as entries:
+        return sorted(
+            entry.path
+            for entry in entries
+            if fuzzing_run_name.match(entry.name) and entry.is_dir()
+        )
+
+
+def list_stats_files(basepath: str) -> list[str]:
+    """
+    Return the sorted paths of all stats files of the fuzzing run at `basepath`.
+    """
+    try:
+        with os.scandir(os.path.join(basepath, "stats")) as entries:
+            return sorted(
+                entry.path for entry in entries if not entry.name.startswith(".")
+            )
+    except FileNotFoundError:
+        return []
+
+
+def last_stats_file(basepath: str) -> tuple[int, str | None]:
+    """
+    Return the number of stats files of the fuzzing run at `basepath` and the path of the last one.
+
+    Only the maximum name is tracked, which avoids sorting the whole directory listing.
+    """
+    count = 0
+    last: os.DirEntry[str] | None = None
+    try:
+        with os.scandir(os.path.join(basepath, "stats")) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                count += 1
+                if last is None or entry.name > last.name:
+                    last = entry
+    except FileNotFoundError:
+        pass
+    return count, last.path if last is not None else None
+
+
+def write_stats_jsonl(basepath: str) -> None:
+    """
+    Concatenate all stats files of the fuzzing run at `basepath` into a single `stats.jsonl`.
+
+    The fuzzer writes each stats file as a single line of JSON.
+    """
+    jsonl_path = os.path.join(basepath, "stats.jsonl")
+    with open(jsonl_path + ".tmp", "wb") as out:
+        for sf in list_stats_files(basepath):
+            with open(sf, "rb") as f:
+                out.write(f.read().rstrip(b"\n"))
+            out.write(b"\n")
+    os.replace(jsonl_path + ".tmp", jsonl_path)
+
+
+def load_stats_jsonl(path: str) -> Stats:
+    with open(path, "rb") as f:
+        # Empty files cannot be mapped
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return [stats_decoder.decode(line) for line in iter(mm.readline, b"")]
+
+
+def load_run_stats(basepath: str) -> Stats:
+    """
+    Load the stats of all samples of a fuzzing run.
+
+    If the run has a `stats.jsonl` (see `write_stats_jsonl`), which is newer than the stats folder, it is used directly.
+    Otherwise, the decoded stats are cached in a single file per run.
+    Later loads read the cache and only decode the stats files which were added or rewritten since.
+    """
+    jsonl_path = os.path.join(basepath, "stats.jsonl")
+    stats_dir = os.path.join(basepath, "stats")
+    if os.path.exists(jsonl_path) and (
+        not os.path.exists(stats_dir)
+        or os.path.getmtime(stats_dir) <= os.path.getmtime(jsonl_path)
+    ):
+        return load_stats_jsonl(jsonl_path)
+
+    cache_path = os.path.join(basepath, "stats-cache.json")
+    statsfiles = list_stats_files(basepath)
+    names = [os.path.basename(sf) for sf in statsfiles]
+    # The fuzzer replaces stats files by renaming a temporary file over them,
+    # so a cache entry is only valid for the same modification time and size.
+    signatures = []
+    for sf in statsfiles:
+        st = os.stat(sf)
+        signatures.append((st.st_mtime_ns, st.st_size))
+    keys = list(zip(names, signatures))
+
+    decoded: dict[tuple[str, tuple[int, int]], FuzzingStats] = {}
+    if os.path.exists(cache_path):
+        with open(cache_path, "rb") as f:
+            cache = orjson.loads(f.read())
+        # Caches written before the signatures were stored are ignored
+        if "signatures" in cache:
+            decoded = {
+                (name, (mtime_ns, size)): stat
+                for name, (mtime_ns, size), stat in zip(
+                    cache["statsfiles"], cache["signatures"], cache["stats"]
+                )
+            }
+
+    missing = [(sf, key) for sf, key in zip(statsfiles, keys) if key not in decoded]
+    if missing:
+        # The file reads release the GIL, so the threads overlap the I/O of many small files
+        with ThreadPoolExecutor() as executor:
+            decoded.update(
+                zip(
+                    (key for _sf, key in missing),
+                    executor.map(load_stats_file, (sf for sf, _key in missing)),
+                )
+            )
+
+    stats = [decoded[key] for key in keys]
+    if missing:
+        try:
+            # Write and rename, such that an interrupted write never leaves a broken cache
+            with open(cache_path + ".tmp", "wb") as f:
+                f.write(
+                    orjson.dumps(
+                        {"statsfiles": names, "signatures": signatures, "stats": stats}
+                    )
+                )
+            os.replace(cache_path + ".tmp", cache_path)
+        except OSError as err:
+            print(f"Could not write stats cache {cache_path}: {err}")
+    return stats
 
 
 def find_available_stats() -> None:
     options = []
 
-    fuzzing_runs = sorted(glob("/mnt/data/Downloads/dnsdiff/20??-??-?? *"))
+    fuzzing_runs = list_fuzzing_runs()
     for fr in fuzzing_runs:
-        statsfiles = sorted(glob(os.path.join(fr, "stats", "*")))
-        if len(statsfiles) == 0:
+        count, last_statsfile = last_stats_file(fr)
+        if last_statsfile is None:
             continue
-        with open(statsfiles[-1]) as f:
-            endtime = json.load(f)["start_time"]["secs"]
-            hours = endtime // 3600
-            minutes = endtime % 3600 // 60
-            pretty_time = f"{hours:>2}:{minutes:0>2}"
+        endtime = load_stats_file(last_statsfile)["start_time"]["secs"]
+        hours = endtime // 3600
+        minutes = endtime % 3600 // 60
+        pretty_time = f"{hours:>2}:{minutes:0>2}"
         options.append(
             (
-                f"{os.path.basename(fr)} (Samples: {len(statsfiles)}, Time: {pretty_time}h)",
+                f"{os.path.basename(fr)} (Samples: {count}, Time: {pretty_time}h)",
                 fr,
             )
         )
@@ -82,11 +316,9 @@ def find_available_stats() -> None:
         with output:
             basepath = change["new"]
             name = os.path.basename(basepath)
-            statsfiles = glob(os.path.join(basepath, "stats", "*"))
-            stats = [json.load(open(sf)) for sf in sorted(statsfiles)]
-            latest_stats = (name, stats)
+            latest_stats = RunData.from_stats(name, load_run_stats(basepath))
             for cb in callbacks:
-                cb(name, stats)
+                cb(latest_stats)
 
     # The `names` doesn't type check since it inferes to the wrong type
     dd.observe(observer, names="value")  # type: ignore
@@ -94,24 +326,25 @@ def find_available_stats() -> None:
     display(dd, output)
 
 
-def register_cb(f: Callable[[Stats], None]) -> None:
-    global latest_stats
-    output = widgets.Output()
+def register_cb(f: Callable[[RunData, Figure], None]) -> None:
+    """
+    Register a plot function, which is called with the run data whenever another fuzzing run is selected.
 
-    def replot(name: str, stats: Stats, op: widgets.Output) -> None:
-        op.clear_output()
-        with op:
-            print(f"Plotting {name}")
-            f(stats)
+    Each plot function owns a single figure, which is reused for all re-plots.
+    """
+    global latest_stats
+    fig = Figure()
 
-    cb = functools.partial(replot, op=output)
-    callbacks.append(cb)
-    with output:
-        print("Registered callback")
-        if latest_stats:
-            cb(latest_stats[0], latest_stats[1])
+    def replot(run: RunData) -> None:
+        f(run, fig)
+        # Only send the new figure to the frontend, instead of clearing and recreating the output
+        handle.update(fig)
 
-    display(output)
+    callbacks.append(replot)
+    # Empty output, which is replaced by the figure once it is plotted
+    handle = display(display_id=True)
+    if latest_stats:
+        replot(latest_stats)
 
 
 find_available_stats()
@@ -129,17 +362,24 @@ find_available_stats()
 
 
 # %%
-def fmt_time_axis(axis: Any, ts_max: float, nmarks: int = 4) -> None:
-    def float_duration_fmt_func(x: float, _pos: int) -> str:
-        hours = int(x // 3600)
-        minutes = int((x % 3600) // 60)
-        # seconds = int(x % 60)
+def float_duration_fmt_func(x: float, _pos: int) -> str:
+    hours = int(x // 3600)
+    minutes = int((x % 3600) // 60)
+    # seconds = int(x % 60)
+
+    return f"{hours:d}:{minutes:02d}"
+    # return "{:d}:{:02d}:{:02d}".format(hours, minutes, seconds)
+
 
-        return f"{hours:d}:{minutes:02d}"
-        # return "{:d}:{:02d}:{:02d}".format(hours, minutes, seconds)
+# The formatter does not depend on the axis, so all axes can share it
+float_duration_fmt = FuncFormatter(float_duration_fmt_func)
 
-    float_duration_fmt = FuncFormatter(float_duration_fmt_func)
 
+@functools.lru_cache
+def time_axis_units(ts_max: float, nmarks: int) -> tuple[int, int]:
+    """
+    Return the major and minor unit for a time axis, a minor unit of 0 means no minor ticks.
+    """
     # We can fit 4 numbers onto the axis.
     # Check which base value we can reasonably use for that
     # There is always the label for 0, so only n-1 other labels
@@ -163,54 +403,103 @@ def fmt_time_axis(axis: Any, ts_max: float, nmarks: int = 4) -> None:
         minor_unit = 0
 
     print(f"{ts_max=} {major_unit=}")
+    return major_unit, minor_unit
+
+
+def fmt_time_axis(axis: Any, ts_max: float, nmarks: int = 4) -> None:
+    major_unit, minor_unit = time_axis_units(float(ts_max), nmarks)
+
     axis.set_major_formatter(float_duration_fmt)
+    # Locators keep a reference to their axis, so they cannot be shared
     axis.set_major_locator(MultipleLocator(base=major_unit))
     if minor_unit != 0:
         axis.set_minor_locator(MultipleLocator(base=minor_unit))
 
 
 # %%
-def coverage_plots(stats: Stats) -> None:
-    plt.rcParams["figure.figsize"] = [8.5, 5]
-
-    # shared x-axis
-    timestamps: list[float] = []
-    # per resolver gather edge coverage percentage
-    edge_coverage_percentage: dict[str, list[float]] = {}
-
-    for stat in stats:
-        # There is no nanosecond option for timedelta
-        ts = stat["start_time"]["secs"] + stat["start_time"]["nanos"] / 1_000_000_000
-        timestamps.append(ts)
-
-        for resolver, rstats in stat["coverage"].items():
-            edge_coverage_percentage.setdefault(resolver, []).append(
-                rstats["explored_edges"] / rstats["edges"] * 100
-            )
+def coverage_columns(run: RunData, *fields: str) -> list[np.ndarray]:
+    """
+    Gather the per resolver coverage `fields` of all samples.
+
+    Each field is returned as an array of shape `(samples, len(run.resolvers))`.
+    """
+    # The coverage stats of all samples and resolvers in row-major order
+    rstats = [
+        stat["coverage"][resolver] for stat in run.stats for resolver in run.resolvers
+    ]
+    shape = (len(run.stats), len(run.resolvers))
+
+    return [
+        np.fromiter(
+            map(itemgetter(field), rstats), dtype=np.float64, count=len(rstats)
+        ).reshape(shape)
+        for field in fields
+    ]
+
+
+def with_origin(values: np.ndarray) -> np.ndarray:
+    """
+    Prepend a 0 entry, such that lines start in the origin.
+    """
+    return np.concatenate(([0], values))
+
+
+def clear_lines(ax: matplotlib.axes.Axes) -> None:
+    """
+    Remove all lines from `ax`, but keep the remaining formatting of the axes.
 
-    for resolver, ecp in edge_coverage_percentage.items():
+    The color cycle is restarted, such that re-plots use the same colors.
+    """
+    for line in list(ax.lines):
+        line.remove()
+    ax.set_prop_cycle(None)
+
+
+def rescale(ax: matplotlib.axes.Axes) -> None:
+    """
+    Recompute the axis limits after the lines changed.
+    """
+    ax.relim()
+    ax.autoscale()
+
+
+# %%
+def coverage_plots(run: RunData, fig: Figure) -> None:
+    fig.set_size_inches(8.5, 5)
+    ax = fig.gca()
+    clear_lines(ax)
+
+    explored_edges, edges = coverage_columns(run, "explored_edges", "edges")
+    timestamps = run.timestamps
+    # per resolver edge coverage percentage
+    edge_coverage_percentage = explored_edges / edges * 100
+
+    for ridx, resolver in enumerate(run.resolvers):
         # Add a fake entry point for time 0 with 0 coverage
-        plt.plot([0] + timestamps, [0] + ecp, label=resolver)
+        ax.plot(
+            with_origin(timestamps),
+            with_origin(edge_coverage_percentage[:, ridx]),
+            label=resolver,
+        )
+    rescale(ax)
 
-    ax = plt.gca()
     ax.yaxis.set_major_formatter(PercentFormatter())
 
     # Format time axis
-    ts_max = max(timestamps)
+    ts_max = timestamps.max()
     fmt_time_axis(ax.xaxis, ts_max)
 
-    plt.legend(
+    ax.legend(
         loc="center left",
         bbox_to_anchor=(1.0, 0.5),
     )
 
-    plt.title("Edge Coverage")
-    plt.xlabel("Time in HH:MM")
-    plt.ylabel("Edge Coverage")
-    plt.xlim(left=0)
-    plt.ylim(bottom=0)
-    plt.savefig("fuzz-edge-coverage-over-time.svg")
-    plt.show()
+    ax.set_title("Edge Coverage")
+    ax.set_xlabel("Time in HH:MM")
+    ax.set_ylabel("Edge Coverage")
+    ax.set_xlim(left=0)
+    ax.set_ylim(bottom=0)
+    fig.savefig("fuzz-edge-coverage-over-time.svg")
 
 
 register_cb(coverage_plots)
@@ -229,114 +518,137 @@ RESOLVER_PRETTY = {
 
 
 # %%
-def coverage_progress_plots(stats: Stats) -> None:
-    plt.rcParams["figure.figsize"] = [8.5, 3.5]
-
-    # shared x-axis
-    timestamps: list[float] = []
-    # per resolver gather the fuzz case count
-    coverage_progress_count: dict[str, list[int]] = {}
-
-    for stat in stats:
-        # There is no nanosecond option for timedelta
-        ts = stat["start_time"]["secs"] + stat["start_time"]["nanos"] / 1_000_000_000
-        timestamps.append(ts)
-
-        for resolver, rstats in stat["coverage"].items():
-            coverage_progress_count.setdefault(resolver, []).append(
-                rstats["progress_fuzz_case_count"]
-            )
+def coverage_progress_plots(run: RunData, fig: Figure) -> None:
+    fig.set_size_inches(8.5, 3.5)
+    ax = fig.gca()
+    clear_lines(ax)
 
-    for resolver, cpc in coverage_progress_count.items():
-        resolver = RESOLVER_PRETTY[resolver]
-        # Add a fake entry point for time 0 with 0 coverage
-        plt.plot([0] + timestamps, [0] + cpc, label=resolver)
+    # per resolver the fuzz case count
+    (coverage_progress_count,) = coverage_columns(run, "progress_fuzz_case_count")
+    timestamps = run.timestamps
 
-    ax = plt.gca()
+    for ridx, resolver in enumerate(run.resolvers):
+        # Add a fake entry point for time 0 with 0 coverage
+        ax.plot(
+            with_origin(timestamps),
+            with_origin(coverage_progress_count[:, ridx]),
+            label=RESOLVER_PRETTY[resolver],
+        )
+    rescale(ax)
 
     # Format time axis
-    ts_max = max(timestamps)
+    ts_max = timestamps.max()
     fmt_time_axis(ax.xaxis, ts_max)
 
-    plt.legend(
+    ax.legend(
         loc="center left",
         bbox_to_anchor=(1.0, 0.5),
     )
 
-    plt.title("Edge Coverage Progress Cases")
-    plt.xlabel("Time in HH:MM")
-    plt.ylabel("Inputs uncovering new edge coverage")
-    plt.xlim(left=0)
-    plt.ylim(bottom=0)
-    plt.savefig("fuzz-coverage-progress-over-time.svg")
-    plt.show()
+    ax.set_title("Edge Coverage Progress Cases")
+    ax.set_xlabel("Time in HH:MM")
+    ax.set_ylabel("Inputs uncovering new edge coverage")
+    ax.set_xlim(left=0)
+    ax.set_ylim(bottom=0)
+    fig.savefig("fuzz-coverage-progress-over-time.svg")
 
 
 register_cb(coverage_progress_plots)
 
 
 # %%
-def coverage_vs_cases_plot(stats: Stats) -> None:
-    plt.rcParams["figure.figsize"] = [7, 5]
-
-    # per resolver gather edge coverage percentage
-    edge_coverage_percentage_vs_coverage_progress: dict[
-        str, tuple[list[float], list[int]]
-    ] = {}
-
-    for stat in stats:
-        for resolver, rstats in stat["coverage"].items():
-            edge_coverage_percentage_vs_coverage_progress.setdefault(
-                resolver, ([], [])
-            )[0].append(rstats["explored_edges"] / rstats["edges"] * 100)
-            edge_coverage_percentage_vs_coverage_progress.setdefault(
-                resolver, ([], [])
-            )[1].append(rstats["progress_fuzz_case_count"])
-
-    for resolver, (ecp, cpc) in edge_coverage_percentage_vs_coverage_progress.items():
+def coverage_vs_cases_plot(run: RunData, fig: Figure) -> None:
+    fig.set_size_inches(7, 5)
+    ax = fig.gca()
+    clear_lines(ax)
+
+    explored_edges, edges, coverage_progress_count = coverage_columns(
+        run, "explored_edges", "edges", "progress_fuzz_case_count"
+    )
+    # per resolver edge coverage percentage
+    edge_coverage_percentage = explored_edges / edges * 100
+
+    for ridx, resolver in enumerate(run.resolvers):
         # Add a fake entry point for time 0 with 0 coverage
-        plt.plot([0] + cpc, [0] + ecp, label=resolver)
+        ax.plot(
+            with_origin(coverage_progress_count[:, ridx]),
+            with_origin(edge_coverage_percentage[:, ridx]),
+            label=resolver,
+        )
+    rescale(ax)
 
-    ax = plt.gca()
     # ax.xaxis.set_major_formatter(float_duration_fmt)
     ax.yaxis.set_major_formatter(PercentFormatter())
-    plt.legend()
+    ax.legend()
 
-    plt.title("Edge Coverage Progress Cases")
-    plt.xlabel("Fuzz Cases progressing edge coverage")
-    plt.ylabel("Edge Coverage")
-    plt.xlim(left=0)
-    plt.ylim(bottom=0)
-    plt.savefig("fuzz-coverage-vs-cases.svg")
-    plt.show()
+    ax.set_title("Edge Coverage Progress Cases")
+    ax.set_xlabel("Fuzz Cases progressing edge coverage")
+    ax.set_ylabel("Edge Coverage")
+    ax.set_xlim(left=0)
+    ax.set_ylim(bottom=0)
+    fig.savefig("fuzz-coverage-vs-cases.svg")
 
 
 register_cb(coverage_vs_cases_plot)
 
 
 # %%
-def differences_plot(stats: Stats, keys: list[str], title: str) -> None:
-    plt.rcParams["figure.figsize"] = [15, 10]
-
-    # shared x-axis
-    timestamps: list[float] = []
-    # per resolver pair, per resolution, count
-    differences: dict[tuple[str, str], dict[str, list[int]]] = {}
-
-    for stat in stats:
-        # There is no nanosecond option for timedelta
-        ts = stat["start_time"]["secs"] + stat["start_time"]["nanos"] / 1_000_000_000
-        timestamps.append(ts)
-
-        for resolvers, dstats in stat["differences"]:
-            per_resolvers = differences.setdefault((resolvers[0], resolvers[1]), {})
-
-            for key in keys:
-                per_resolvers.setdefault(key, []).append(dstats[key])
-
-    all_resolvers: list[str] = sorted({r for rs in differences for r in rs})
-
-    fig = plt.gcf()
+@dataclasses.dataclass
+class GridFigure:
+    """
+    Figure with one subplot per pair of resolvers.
+
+    The subplots are reused when the same resolvers are plotted again.
+    The lines are recreated on every re-plot, since the keys and their styles differ between runs.
+    """
+
+    fig: Figure
+    axes: Any
+    all_resolvers: list[str]
+
+    def clear_lines(self) -> None:
+        """
+        Remove all lines and restart the color cycle of every subplot.
+        """
+        for ax in self.fig.axes:
+            clear_lines(ax)
+
+    def plot_line(self, row: int, col: int, xs: Any, ys: Any, **kwargs: Any) -> Line2D:
+        """
+        Add a line with the line properties `kwargs` to the subplot `row`/`col`.
+
+        The lines are rasterized when saving as SVG, while the axes and labels stay vector graphics.
+        """
+        (line,) = self.axes[row][col].plot(xs, ys, rasterized=True, **kwargs)
+        return line
+
+    def rescale(self) -> None:
+        """
+        Recompute the axis limits after the line data changed.
+        """
+        for ax in self.fig.axes:
+            rescale(ax)
+
+    def replace_legend(self, *args: Any, **kwargs: Any) -> None:
+        for legend in self.fig.legends:
+            legend.remove()
+        self.fig.legend(*args, **kwargs)
+
+
+grid_figures: dict[Figure, GridFigure] = {}
+
+
+def grid_figure(fig: Figure, all_resolvers: list[str]) -> GridFigure:
+    """
+    Return the resolver grid of `fig`.
+
+    New subplots are only created if the figure has no grid yet or the set of resolvers changed.
+    """
+    grid = grid_figures.get(fig)
+    if grid is not None and grid.all_resolvers == all_resolvers:
+        return grid
+
+    fig.clear()
     gs = fig.add_gridspec(
         # -1 because we don't need space for the diagonal
         nrows=len(all_resolvers) - 1,
@@ -344,38 +656,153 @@ def differences_plot(stats: Stats, keys: list[str], title: str) -> None:
         hspace=0,
         wspace=0,
     )
+    # Always return a 2D array, even if the dimensions are 1 by 1
     axes = gs.subplots(
         sharex=True,
         sharey=True,
+        squeeze=False,
+    )
+
+    grid = GridFigure(fig, axes, all_resolvers)
+    grid_figures[fig] = grid
+    return grid
+
+
+def per_pair_counts(run: RunData, field: str, diff_keys: list[str]) -> np.ndarray:
+    """
+    Gather the counts of the difference stats `field`, e.g., `per_diff_kind`, for all resolver pairs.
+
+    The counts have the shape `(pairs, keys, samples)`.
+    After the `diff_keys` follows the total number of comparisons of the resolver pair.
+    """
+    pair_idx = {pair: idx for idx, pair in enumerate(run.pairs)}
+    key_idx = {key: idx for idx, key in enumerate(diff_keys)}
+    width = len(diff_keys) + 1
+
+    # Fill a flat list in `(samples, pairs, keys)` order and convert it once
+    # Some keys might not exist or not exist for all timestamps, those stay 0
+    counts = [0] * (len(run.stats) * len(run.pairs) * width)
+
+    for sidx, stat in enumerate(run.stats):
+        for resolvers, dstats in stat["differences"]:
+            pidx = pair_idx[(resolvers[0], resolvers[1])]
+            start = (sidx * len(run.pairs) + pidx) * width
+            counts[start + width - 1] = dstats["total"]
+            for key, count in dstats.get(field, {}).items():
+                counts[start + key_idx[key]] = count
+
+    return (
+        np.array(counts, dtype=np.int64)
+        .reshape(len(run.stats), len(run.pairs), width)
+        .transpose(1, 2, 0)
     )
-    # Axes is not an array if the dimensions are 1 by 1
-    if type(axes) == matplotlib.axes.Axes:
-        axes = [[axes]]
 
-    for resolvers, resolvers_diff_counts in differences.items():
-        idx1 = all_resolvers.index(resolvers[0])
-        idx2 = all_resolvers.index(resolvers[1])
+
+def per_pair_values(run: RunData, keys: list[str]) -> np.ndarray:
+    """
+    Gather the difference stats `keys`, e.g., `significant`, for all resolver pairs.
+
+    The values have the shape `(pairs, keys, samples)`.
+    """
+    pair_idx = {pair: idx for idx, pair in enumerate(run.pairs)}
+
+    # Pairs which do not exist for all timestamps stay 0
+    values = np.zeros((len(run.pairs), len(keys), len(run.stats)), dtype=np.int64)
+
+    for sidx, stat in enumerate(run.stats):
+        for resolvers, dstats in stat["differences"]:
+            pidx = pair_idx[(resolvers[0], resolvers[1])]
+            for kidx, key in enumerate(keys):
+                values[pidx, kidx, sidx] = dstats[key]
+
+    return values
+
+
+def diff_key_line_styles(diff_keys: list[str]) -> dict[str, dict[str, Any]]:
+    """
+    Return the line properties for the `diff_keys` and the total of `per_pair_counts`.
+
+    The markers of each key are shifted, such that they do not overlap.
+    The `total` is drawn as a plain line in the background.
+    """
+    styles: dict[str, dict[str, Any]] = {
+        diff_key: {
+            "label": diff_key,
+            "markevery": ((idx / (len(diff_keys) + 1)) * 0.25, 0.25),
+        }
+        for idx, diff_key in enumerate(diff_keys)
+    }
+    styles["total"] = {
+        "markevery": None,
+        "color": "black",
+        "alpha": 0.5,
+        "marker": "",
+        "linestyle": "solid",
+    }
+    return styles
+
+
+def draw_pair_grid(
+    fig: Figure,
+    timestamps: np.ndarray,
+    pairs: list[tuple[str, str]],
+    counts: np.ndarray,
+    line_styles: dict[str, dict[str, Any]],
+    *,
+    hide_empty: bool = False,
+    pretty_names: bool = False,
+    nmarks: int = 4,
+    legend_ncols: int = 1,
+) -> None:
+    """
+    Draw the `counts` of each resolver pair into its subplot of the resolver grid of `fig`.
+
+    The `counts` have the shape `(pairs, keys, samples)` and `line_styles` contains the line properties of each key in the same order.
+    With `hide_empty` the lines of keys without any counts are moved outside the drawing range.
+    The legend lists the labeled keys sorted by name, with `hide_empty` only those with counts in any subplot.
+    """
+    all_resolvers: list[str] = sorted({r for rs in pairs for r in rs})
+    resolver_idx = {r: idx for idx, r in enumerate(all_resolvers)}
+
+    grid = grid_figure(fig, all_resolvers)
+    axes = grid.axes
+    grid.clear_lines()
+
+    # One drawn line per labeled key, used as the legend entry of the key
+    legend_lines: dict[str, Line2D] = {}
+    xs = with_origin(timestamps)
+    for pidx, resolvers in enumerate(pairs):
+        idx1 = resolver_idx[resolvers[0]]
+        idx2 = resolver_idx[resolvers[1]]
         # The invariant is that idx1 < idx2
         # Therefore we need to substract 1 from idx2, since we decreased the grid size
-        ax = axes[idx2 - 1][idx1]
-
-        for diff_key, diff_count in resolvers_diff_counts.items():
-            ax.plot(
-                [0] + timestamps,
-                [0] + diff_count,
-                label=diff_key,
-                markevery=0.25,
-            )
+        row, col = idx2 - 1, idx1
+
+        for idx, (key, style) in enumerate(line_styles.items()):
+            diff_count = counts[pidx, idx]
+            has_data = diff_count.max() > 0
+            if hide_empty and not has_data:
+                # Plot outside the drawing range but preserve that each key is plotted for each subplot
+                # This preserves the correct color order between them
+                grid.plot_line(row, col, [-1000], [-1000], **style)
+                continue
+
+            line = grid.plot_line(row, col, xs, with_origin(diff_count), **style)
+            if "label" in style:
+                legend_lines.setdefault(key, line)
+    grid.rescale()
 
     # Set limits. All axes are shared, setting once is enough
     axes[0][0].set_xlim(left=0)
     axes[0][0].set_ylim(bottom=0)
     # Format time axis
-    ts_max = max(timestamps)
-    fmt_time_axis(axes[0][0].xaxis, ts_max)
+    ts_max = timestamps.max()
+    fmt_time_axis(axes[0][0].xaxis, ts_max, nmarks=nmarks)
 
     # Set a label for each row/column
     for idx, res in enumerate(all_resolvers):
+        if pretty_names:
+            res = RESOLVER_PRETTY[res]
         if idx > 0:
             # Move the alignment of the tick labels, such that they don't overlap
             # The first tick label gets moved right, and the last ones left
@@ -406,10 +833,11 @@ def differences_plot(stats: Stats, keys: list[str], title: str) -> None:
             if idx_out < idx:
                 ax.axis("off")
 
-    handles, labels = axes[0][0].get_legend_handles_labels()
-    fig.legend(
-        handles,
+    labels = sorted(legend_lines)
+    grid.replace_legend(
+        [legend_lines[label] for label in labels],
         labels,
+        ncols=legend_ncols,
         # The upper right hand corner of the legend
         loc="upper right",
         # must be places on the right hand (1.0) upper (1.0) corner
@@ -418,17 +846,30 @@ def differences_plot(stats: Stats, keys: list[str], title: str) -> None:
         bbox_transform=axes[0][-1].transAxes,
     )
 
+
+# %%
+def differences_plot(run: RunData, fig: Figure, keys: list[str], title: str) -> None:
+    fig.set_size_inches(15, 10)
+
+    draw_pair_grid(
+        fig,
+        run.timestamps,
+        run.pairs,
+        per_pair_values(run, keys),
+        {key: {"label": key, "markevery": 0.25} for key in keys},
+    )
+
+    slug = title.replace(" ", "-").lower()
     fig.supxlabel("Runtime in HH:MM")
     fig.supylabel("Resolver comparisons")
     fig.suptitle(title)
-    slug = title.replace(" ", "-").lower()
-    plt.savefig(f"fuzz-resolver-comparisons-{slug}.svg")
-    plt.show()
+    fig.savefig(f"fuzz-resolver-comparisons-{slug}.svg", dpi=150)
 
 
 register_cb(
-    lambda stats: differences_plot(
-        stats,
+    lambda run, fig: differences_plot(
+        run,
+        fig,
         keys=[
             # "no_diff",
             "insignificant",
@@ -439,8 +880,9 @@ register_cb(
     )
 )
 register_cb(
-    lambda stats: differences_plot(
-        stats,
+    lambda run, fig: differences_plot(
+        run,
+        fig,
         keys=[
             # "repro_no_diff",
             "repro_insignificant",
@@ -453,297 +895,48 @@ register_cb(
 
 
 # %%
-def difference_kinds_plot(stats: Stats) -> None:
-    plt.rcParams["figure.figsize"] = [15, 10]
-
-    # Gather a list of all the diffkinds
-    # Checking the last timestamp should be enough, since this list can only every increment
-    all_diffkinds: set[str] = {
-        key
-        for dstats in stats[-1]["differences"]
-        for key in dstats[1]["per_diff_kind"].keys()
-    }
-
-    # shared x-axis
-    timestamps: list[float] = []
-    # per resolver pair, per resolution, count
-    differences: dict[tuple[str, str], dict[str, list[int]]] = {}
-
-    for idx, stat in enumerate(stats):
-        # There is no nanosecond option for timedelta
-        ts = stat["start_time"]["secs"] + stat["start_time"]["nanos"] / 1_000_000_000
-        timestamps.append(ts)
-
-        for resolvers, dstats in stat["differences"]:
-            per_resolvers = differences.setdefault((resolvers[0], resolvers[1]), {})
-            total = dstats["total"]
-            dstats = dstats["per_diff_kind"]
-
-            for key in all_diffkinds:
-                # Some keys might not exist or not exist for all timestamps
-                per_resolver_stats = per_resolvers.setdefault(key, [])
-                per_resolver_stats.append(dstats.get(key, 0))
-
-            per_resolver_stats = per_resolvers.setdefault("total", [])
-            per_resolver_stats.append(total)
-
-    all_resolvers: list[str] = sorted({r for rs in differences for r in rs})
-
-    fig = plt.gcf()
-    gs = fig.add_gridspec(
-        # -1 because we don't need space for the diagonal
-        nrows=len(all_resolvers) - 1,
-        ncols=len(all_resolvers) - 1,
-        hspace=0,
-        wspace=0,
-    )
-    axes = gs.subplots(
-        sharex=True,
-        sharey=True,
-    )
-    # Axes is not an array if the dimensions are 1 by 1
-    if type(axes) == matplotlib.axes.Axes:
-        axes = [[axes]]
-
-    for resolvers, resolvers_diff_counts in differences.items():
-        idx1 = all_resolvers.index(resolvers[0])
-        idx2 = all_resolvers.index(resolvers[1])
-        # The invariant is that idx1 < idx2
-        # Therefore we need to substract 1 from idx2, since we decreased the grid size
-        ax = axes[idx2 - 1][idx1]
-
-        idx_max = len(resolvers_diff_counts)
-        for idx, (diff_key, diff_count) in enumerate(resolvers_diff_counts.items()):
-            if max(diff_count) > 0:
-                if diff_key == "total":
-                    # print([0] + timestamps)
-                    # print([0] + diff_count)
-                    ax.plot(
-                        [0] + timestamps,
-                        [0] + diff_count,
-                        markevery=None,
-                        color="black",
-                        alpha=0.5,
-                        marker="",
-                        linestyle="solid",
-                    )
-                else:
-                    ax.plot(
-                        [0] + timestamps,
-                        [0] + diff_count,
-                        label=diff_key,
-                        markevery=((idx / idx_max) * 0.25, 0.25),
-                    )
-            else:
-                # Plot outside the drawing range but preserve that each key is plotted for each subplot
-                # This preserves the correct color order between them
-                ax.plot([-1000], [-1000], label=diff_key)
-
-    # Set limits. All axes are shared, setting once is enough
-    axes[0][0].set_xlim(left=0)
-    axes[0][0].set_ylim(bottom=0)
-    # Format time axis
-    ts_max = max(timestamps)
-    fmt_time_axis(axes[0][0].xaxis, ts_max)
-
-    # Set a label for each row/column
-    for idx, res in enumerate(all_resolvers):
-        if idx > 0:
-            # Move the alignment of the tick labels, such that they don't overlap
-            # The first tick label gets moved right, and the last ones left
-            # That ensures that at neighboring plot they don't overlap
-            ticklabels = axes[-1][idx - 1].get_xticklabels()
-            # set the alignment for outer ticklabels
-            ticklabels[0].set_ha("left")
-            ticklabels[1].set_ha("left")
-            ticklabels[-2].set_ha("right")
-            ticklabels[-1].set_ha("right")
-
-            axes[idx - 1][0].set_ylabel(res)
-        if idx < len(all_resolvers) - 1:
-            axes[-1][idx].set_xlabel(res)
-
-    for idx_out, ax_outer in enumerate(axes):
-        for idx, ax in enumerate(ax_outer):
-            # Hide x labels and tick labels for all but outer plots.
-            ax.label_outer()
-            ax.tick_params(
-                # x, y, both
-                axis="both",
-                # major, minor, both
-                which="both",
-                # in, out, inout
-                direction="inout",
-            )
-            if idx_out < idx:
-                ax.axis("off")
-
-    handles, labels = axes[0][0].get_legend_handles_labels()
-    fig.legend(
-        handles,
-        labels,
-        ncols=2,
-        # The upper right hand corner of the legend
-        loc="upper right",
-        # must be places on the right hand (1.0) upper (1.0) corner
-        bbox_to_anchor=(1.0, 1.0),
-        # of the specified axes. [0][-1] picks the upper right hand subfigure
-        bbox_transform=axes[0][-1].transAxes,
+def difference_kinds_plot(run: RunData, fig: Figure) -> None:
+    fig.set_size_inches(15, 10)
+
+    draw_pair_grid(
+        fig,
+        run.timestamps,
+        run.pairs,
+        per_pair_counts(run, "per_diff_kind", run.diff_kinds),
+        diff_key_line_styles(run.diff_kinds),
+        hide_empty=True,
+        legend_ncols=2,
     )
 
     fig.supxlabel("Runtime in HH:MM")
     fig.supylabel("Occurence of Difference in Resolver Comparisons")
     fig.suptitle("Difference Kinds")
-    plt.savefig("fuzz-resolver-comparisons-diff-kinds.svg")
-    plt.show()
+    fig.savefig("fuzz-resolver-comparisons-diff-kinds.svg", dpi=150)
 
 
 register_cb(difference_kinds_plot)
 
 
 # %%
-def difference_category_plot(stats: Stats) -> None:
-    plt.rcParams["figure.figsize"] = [10, 7]
-
-    # Gather a list of all the diffkinds
-    # Checking the last timestamp should be enough, since this list can only every increment
-    all_diffkinds: set[str] = {
-        key
-        for dstats in stats[-1]["differences"]
-        for key in dstats[1]["per_diff_category"].keys()
-    }
-
-    # shared x-axis
-    timestamps: list[float] = []
-    # per resolver pair, per resolution, count
-    differences: dict[tuple[str, str], dict[str, list[int]]] = {}
-
-    for idx, stat in enumerate(stats):
-        # There is no nanosecond option for timedelta
-        ts = stat["start_time"]["secs"] + stat["start_time"]["nanos"] / 1_000_000_000
-        timestamps.append(ts)
-
-        for resolvers, dstats in stat["differences"]:
-            per_resolvers = differences.setdefault((resolvers[0], resolvers[1]), {})
-            total = dstats["total"]
-            dstats = dstats["per_diff_category"]
-
-            for key in all_diffkinds:
-                # Some keys might not exist or not exist for all timestamps
-                per_resolver_stats = per_resolvers.setdefault(key, [])
-                per_resolver_stats.append(dstats.get(key, 0))
-
-            per_resolver_stats = per_resolvers.setdefault("total", [])
-            per_resolver_stats.append(total)
-
-    all_resolvers: list[str] = sorted({r for rs in differences for r in rs})
-
-    fig = plt.gcf()
-    gs = fig.add_gridspec(
-        # -1 because we don't need space for the diagonal
-        nrows=len(all_resolvers) - 1,
-        ncols=len(all_resolvers) - 1,
-        hspace=0,
-        wspace=0,
-    )
-    axes = gs.subplots(
-        sharex=True,
-        sharey=True,
-    )
-    # Axes is not an array if the dimensions are 1 by 1
-    if type(axes) == matplotlib.axes.Axes:
-        axes = [[axes]]
-
-    for resolvers, resolvers_diff_counts in differences.items():
-        idx1 = all_resolvers.index(resolvers[0])
-        idx2 = all_resolvers.index(resolvers[1])
-        # The invariant is that idx1 < idx2
-        # Therefore we need to substract 1 from idx2, since we decreased the grid size
-        ax = axes[idx2 - 1][idx1]
-
-        idx_max = len(resolvers_diff_counts)
-        for idx, (diff_key, diff_count) in enumerate(resolvers_diff_counts.items()):
-            if max(diff_count) > 0:
-                if diff_key == "total":
-                    ax.plot(
-                        [0] + timestamps,
-                        [0] + diff_count,
-                        markevery=None,
-                        color="black",
-                        alpha=0.5,
-                        marker="",
-                        linestyle="solid",
-                    )
-                else:
-                    ax.plot(
-                        [0] + timestamps,
-                        [0] + diff_count,
-                        label=diff_key,
-                        markevery=((idx / idx_max) * 0.25, 0.25),
-                    )
-            else:
-                # Plot outside the drawing range but preserve that each key is plotted for each subplot
-                # This preserves the correct color order between them
-                ax.plot([-1000], [-1000], label=diff_key)
-
-    # Set limits. All axes are shared, setting once is enough
-    axes[0][0].set_xlim(left=0)
-    axes[0][0].set_ylim(bottom=0)
-    # Format time axis
-    ts_max = max(timestamps)
-    fmt_time_axis(axes[0][0].xaxis, ts_max, nmarks=3)
-
-    # Set a label for each row/column
-    for idx, res in enumerate(all_resolvers):
-        res = RESOLVER_PRETTY[res]
-        if idx > 0:
-            # Move the alignment of the tick labels, such that they don't overlap
-            # The first tick label gets moved right, and the last ones left
-            # That ensures that at neighboring plot they don't overlap
-            ticklabels = axes[-1][idx - 1].get_xticklabels()
-            # set the alignment for outer ticklabels
-            ticklabels[0].set_ha("left")
-            ticklabels[1].set_ha("left")
-            ticklabels[-2].set_ha("right")
-            ticklabels[-1].set_ha("right")
-
-            axes[idx - 1][0].set_ylabel(res)
-        if idx < len(all_resolvers) - 1:
-            axes[-1][idx].set_xlabel(res)
-
-    for idx_out, ax_outer in enumerate(axes):
-        for idx, ax in enumerate(ax_outer):
-            # Hide x labels and tick labels for all but outer plots.
-            ax.label_outer()
-            ax.tick_params(
-                # x, y, both
-                axis="both",
-                # major, minor, both
-                which="both",
-                # in, out, inout
-                direction="inout",
-            )
-            if idx_out < idx:
-                ax.axis("off")
-
-    handles, labels = axes[0][0].get_legend_handles_labels()
-    fig.legend(
-        handles,
-        labels,
-        ncols=2,
-        # The upper right hand corner of the legend
-        loc="upper right",
-        # must be places on the right hand (1.0) upper (1.0) corner
-        bbox_to_anchor=(1.0, 1.0),
-        # of the specified axes. [0][-1] picks the upper right hand subfigure
-        bbox_transform=axes[0][-1].transAxes,
+def difference_category_plot(run: RunData, fig: Figure) -> None:
+    fig.set_size_inches(10, 7)
+
+    draw_pair_grid(
+        fig,
+        run.timestamps,
+        run.pairs,
+        per_pair_counts(run, "per_diff_category", run.diff_categories),
+        diff_key_line_styles(run.diff_categories),
+        hide_empty=True,
+        pretty_names=True,
+        nmarks=3,
+        legend_ncols=2,
     )
 
     fig.supxlabel("Runtime in HH:MM")
     fig.supylabel("Occurence of Difference Categories in Resolver Comparisons")
     fig.suptitle("Difference Categories")
-    plt.savefig("fuzz-resolver-comparisons-diff-category.svg")
-    plt.show()
+    fig.savefig("fuzz-resolver-comparisons-diff-category.svg", dpi=150)
 
 
 register_cb(difference_category_plot)
@@ -1,18 +1,17 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
-import json
 import lzma
 import math
 import sys
-from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Any
 
+import ijson
 import numpy as np
 import scipy.cluster.hierarchy as cluster
-from matplotlib import pyplot as plt
 from matplotlib.axes import Axes
+from matplotlib.figure import Figure
 from matplotlib.offsetbox import AnnotationBbox, OffsetImage
 from scipy.spatial.distance import pdist
 
@@ -29,42 +28,27 @@ def print_help(pgrm: str) -> None:
 
 @dataclass
 class Counter:
-    counts: list[int]
-
-    @classmethod
-    def new_with_length(cls, init: int, l: int) -> Counter:
-        return Counter([init for _ in range(0, l)])
+    # The raw uint32 counts, normalization happens on the stacked matrix of all counters
+    counts: np.ndarray
 
     def __len__(self) -> int:
         return len(self.counts)
 
-    def max_pairwise(self, other: Counter) -> None:
-        assert len(self) == len(other), "self and other need to have the same length"
-        self.counts = [max(a, b) for a, b in zip(self.counts, other.counts)]
-
-    def shrink_by_pattern(self, pattern: Counter) -> None:
-        assert len(self) == len(
-            pattern
-        ), "self and pattern need to have the same length"
-        self.counts = [s for s, p in zip(self.counts, pattern.counts) if p > 0]
-
-    def distance(self, other: Counter) -> int:
-        assert len(self) == len(other), "self and other need to have the same length"
-        return sum(abs(a - b) for a, b in zip(self.counts, other.counts))
 
-    def normalize_counter(self, other: Counter) -> None:
-        assert len(self) == len(other), "self and other need to have the same length"
-        self.counts = [(s * 255) // p for s, p in zip(self.counts, other.counts)]
+def convert_to_images(counters_matrix: np.ndarray) -> np.ndarray:
+    """
+    Convert each row of the normalized `counters_matrix` into a square image.
 
-    def convert_to_image(self) -> Any:
-        # let img_size = ((self.counter.len() as f64).sqrt().floor() + 1.) as u32;
-        img_size = math.floor(math.sqrt(len(self))) + 1
-        img = np.zeros((img_size, img_size), dtype=np.float32)
-        for idx, count in enumerate(self.counts):
-            x = idx // img_size
-            y = idx % img_size
-            img[x, y] = count / 255
-        return img
+    All images share one preallocated buffer of the shape `(counters, img_size, img_size)`.
+    """
+    counters, counter_len = counters_matrix.shape
+    # let img_size = ((self.counter.len() as f64).sqrt().floor() + 1.) as u32;
+    img_size = math.isqrt(counter_len) + 1
+    # Fill the images row by row, the remaining pixels stay 0
+    imgs = np.zeros((counters, img_size * img_size), dtype=np.float32)
+    imgs[:, :counter_len] = counters_matrix
+    imgs /= 255
+    return imgs.reshape(counters, img_size, img_size)
 
 
 @dataclass
@@ -78,21 +62,75 @@ class Input:
 def read_fuzzer_output(
     file: str,
 ) -> dict[str, tuple[Counter, list[Input]]]:
-    data = json.load(lzma.open(file))
-    # The outer layer only contains version information
-    data = data["Version2"]
     res = {}
-    # hash, data
-    for h, d in data["counters"]:
-        counter = Counter(counts=d[0]["counter"])
-        inputs = [Input(i) for i in d[1]]
-        res[h] = (counter, inputs)
-
-        if len(res) >= 100:
-            break
+    with lzma.open(file, "rb") as f:
+        # Stream the counters, such that the file is only decompressed and parsed up to the last used counter
+        # The outer layer only contains version information
+        # hash, data
+        for h, d in ijson.items(f, "Version2.counters.item"):
+            counter = Counter(counts=np.asarray(d[0]["counter"], dtype=np.uint32))
+            inputs = [Input(i) for i in d[1]]
+            res[h] = (counter, inputs)
+
+            if len(res) >= 100:
+                break
     return res
 
 
+def plot_clustering(
+    threshold: float,
+    method: str,
+    distances_pairwise: np.ndarray,
+    labels: list[str],
+    images: np.ndarray,
+) -> str:
+    """
+    Cluster the counters with the linkage `method` and save the dendrogram to `cluster-{method}.svg`.
+
+    The `labels` and `images` are in the same order as the counters in `distances_pairwise`.
+
+    Returns the `method` once the file is written.
+    """
+    Z = cluster.linkage(distances_pairwise, method=method, optimal_ordering=True)
+    # Figures created without pyplot do not need an interactive backend
+    # and are freed after saving, instead of staying open until the process exits
+    fig = Figure(figsize=(15, len(labels) * 0.15 * 5))
+    ax = fig.add_subplot()
+    dn = cluster.dendrogram(
+        Z,
+        color_threshold=threshold,
+        distance_sort="ascending",  # type: ignore
+        labels=labels,
+        orientation="right",
+        show_contracted=True,
+        show_leaf_counts=True,
+        ax=ax,
+    )
+    lbls = ax.get_ymajorticklabels()  # type: ignore # matplotlib does not have usable type annotations
+
+    def offset_image(img: np.ndarray, coord: tuple[int, int], ax: Axes) -> None:
+        im = OffsetImage(img, zoom=1)
+        im.image.axes = ax  # type: ignore
+
+        ab = AnnotationBbox(
+            im,
+            coord,
+            xybox=(-12.0, 0.0),
+            frameon=False,
+            xycoords="data",
+            boxcoords="offset points",
+            pad=0,
+        )
+        ax.add_artist(ab)  # type: ignore # matplotlib does not have usable type annotations
+
+    # The leaves are the counter indices in the order of the tick labels
+    for leaf, lbl in zip(dn["leaves"], lbls):
+        offset_image(images[leaf], lbl.get_position(), ax)
+
+    fig.savefig(f"cluster-{method}.svg", bbox_inches="tight")
+    return method
+
+
 def main() -> None:
     if len(sys.argv) < 2:
         print_help(sys.argv[0])
@@ -100,84 +138,58 @@ def main() -> None:
     fuzzer_output = read_fuzzer_output(sys.argv[1])
     print(len(fuzzer_output))
 
+    # One row per counter
+    counters_raw = np.stack([counter.counts for counter, _ in fuzzer_output.values()])
+
     # Get a counter where all fields are set (!= 0) which are set in any counter
-    counter_len = len(next(iter(fuzzer_output.values()))[0])
-    elementwise_max = Counter.new_with_length(0, counter_len)
+    elementwise_max = Counter(np.maximum.reduce(counters_raw))
     print(len(elementwise_max))
 
-    # Collect all the counters which are ever set
-    for counter, _ in fuzzer_output.values():
-        elementwise_max.max_pairwise(counter)
-
     # Remove all the parts which are always 0
-    elementwise_max_shrunk = deepcopy(elementwise_max)
-    elementwise_max_shrunk.shrink_by_pattern(elementwise_max)
-    for counter, _ in fuzzer_output.values():
-        counter.shrink_by_pattern(elementwise_max)
-        counter.normalize_counter(elementwise_max_shrunk)
-    elementwise_max = elementwise_max_shrunk
-    elementwise_max.normalize_counter(elementwise_max)
-
-    # pdist requires a 2-dimensional array, without any good reason
-    # So convert the list into an list of 1-element lists to fullfill this requirement
-    # The comparison lambda just has to take the 0th element every time
-    counters_matrix: list[list[Counter]] = [[d[0]] for d in fuzzer_output.values()]
-    distances_pairwise = pdist(
-        counters_matrix, lambda a, b: a[0].distance(b[0]) / max(len(a[0]), len(b[0]))  # type: ignore
-    )
-    for threshold, method in [
-        (2, "single"),
-        (4, "average"),
-        (5, "weighted"),
-        (4, "centroid"),
-        (5, "median"),
-        (50, "ward"),
-    ]:
-        Z = cluster.linkage(distances_pairwise, method=method, optimal_ordering=True)
-        plt.figure(figsize=(15, len(fuzzer_output) * 0.15 * 5))
-        ax = plt.gca()
-        labels = []
-        for h, v in fuzzer_output.items():
-            input_count = len(v[1])
-            hash_ = h
-            space = " " * 15
-            # inputs = "\n".join(map(str, v[1]))
-            labels.append(f"{input_count} - {hash_}{space}")
-        dn = cluster.dendrogram(
-            Z,
-            color_threshold=threshold,
-            distance_sort="ascending",  # type: ignore
-            labels=labels,
-            orientation="right",
-            show_contracted=True,
-            show_leaf_counts=True,
-        )
-        label_on_index = dn["ivl"]
-        lbls = ax.get_ymajorticklabels()  # type: ignore # matplotlib does not have usable type annotations
-
-        def offset_image(counter_hash: str, coord: tuple[int, int], ax: Axes) -> None:
-            ctr = fuzzer_output[counter_hash][0]
-            img = ctr.convert_to_image()
-            im = OffsetImage(img, zoom=1)
-            im.image.axes = ax  # type: ignore
-
-            ab = AnnotationBbox(
-                im,
-                coord,
-                xybox=(-12.0, 0.0),
-                frameon=False,
-                xycoords="data",
-                boxcoords="offset points",
-                pad=0,
+    is_set = elementwise_max.counts > 0
+    # Boolean indexing returns a copy
+    elementwise_max_shrunk = Counter(elementwise_max.counts[is_set])
+    counters_raw = counters_raw[:, is_set]
+
+    # Scale each field to 0-255 relative to its maximum in any counter
+    # Widen while multiplying and divide in place, such that only one temporary matrix is allocated
+    scaled = np.multiply(counters_raw, 255, dtype=np.uint64)
+    np.floor_divide(scaled, elementwise_max_shrunk.counts, out=scaled)
+    counters_matrix = scaled.astype(np.uint8)
+
+    # All counters have the same length after shrinking,
+    # so the distance is the L1 distance divided by the counter length.
+    # pdist converts the uint8 matrix to float64 once, so no cast is needed here.
+    distances_pairwise = pdist(counters_matrix, metric="cityblock")
+    distances_pairwise /= counters_matrix.shape[1]
+    # The images and labels are the same for all clustering methods
+    images = convert_to_images(counters_matrix)
+    space = " " * 15
+    # inputs = "\n".join(map(str, v[1]))
+    labels = [f"{len(v[1])} - {h}{space}" for h, v in fuzzer_output.items()]
+
+    # The methods are independent, so cluster and plot them in parallel
+    with ProcessPoolExecutor() as executor:
+        futures = [
+            executor.submit(
+                plot_clustering,
+                threshold,
+                method,
+                distances_pairwise,
+                labels,
+                images,
             )
-            ax.add_artist(ab)  # type: ignore # matplotlib does not have usable type annotations
-
-        for idx, lbl in enumerate(lbls):
-            counter_hash = label_on_index[idx].split(" - ")[1].split("\n")[0].strip()
-            offset_image(counter_hash, lbl.get_position(), ax)
-
-        plt.savefig(f"cluster-{method}.svg", bbox_inches="tight")
-        print(f"Finished {method}")
+            for threshold, method in [
+                (2, "single"),
+                (4, "average"),
+                (5, "weighted"),
+                (4, "centroid"),
+                (5, "median"),
+                (50, "ward"),
+            ]
+        ]
+        for future in futures:
+            print(f"Finished {future.result()}")
 
 
 if __name__ == "__main__":